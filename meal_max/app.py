@@ -4,7 +4,11 @@ from flask import Flask, jsonify, make_response, Response, request
 
 from meal_max.models import kitchen_model
 from meal_max.models.battle_model import BattleModel
-from meal_max.utils.sql_utils import check_database_connection, check_table_exists
+from meal_max.models.battle_queue import BattleQueue, BattleQueueFull
+from meal_max.models.leaderboard_index import leaderboard_index
+from meal_max.utils.sql_utils import (
+    check_column_exists, check_database_connection, check_table_exists, migrate_meals_table
+)
 
 
 # Load environment variables from .env file
@@ -19,6 +23,23 @@ app = Flask(__name__)
 # Initialize the BattleModel
 battle_model = BattleModel()
 
+# Initialize the battle job queue; its workers start on the first submitted battle
+battle_queue = BattleQueue()
+
+# Bring databases created before the battle_score column up to date.
+# If this fails, /api/db-check reports the missing column.
+try:
+    migrate_meals_table()
+except Exception as e:
+    app.logger.error("Could not migrate the meals table: %s", str(e))
+
+# Load the in-process leaderboard index from the database.
+# If this fails, the index loads itself on the first rank lookup instead.
+try:
+    leaderboard_index.rebuild()
+except Exception as e:
+    app.logger.warning("Deferring leaderboard index load: %s", str(e))
+
 ####################################################
 #
 # Healthchecks
@@ -54,6 +75,9 @@ def db_check() -> Response:
         app.logger.info("Checking if meals table exists...")
         check_table_exists("meals")
         app.logger.info("meals table exists.")
+        app.logger.info("Checking if meals table has the battle_score column...")
+        check_column_exists("meals", "battle_score")
+        app.logger.info("battle_score column exists.")
         return make_response(jsonify({'database_status': 'healthy'}), 200)
     except Exception as e:
         return make_response(jsonify({'error': str(e)}), 404)
@@ -206,6 +230,75 @@ def battle() -> Response:
         app.logger.error(f"Battle error: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/battle-jobs', methods=['POST'])
+def submit_battle_job() -> Response:
+    """
+    Route to queue a battle between two meals and return immediately with a job ID.
+
+    Expected JSON Input:
+        - meal_ids (list[int]): The IDs of the two meals to battle.
+
+    Returns:
+        JSON response with the ID of the queued battle job.
+    Raises:
+        400 error if input validation fails.
+        429 error if the battle queue is full.
+        500 error if there is an issue queueing the battle.
+    """
+    try:
+        data = request.get_json()
+        meal_ids = data.get('meal_ids')
+
+        if (not isinstance(meal_ids, list) or len(meal_ids) != 2
+                or not all(isinstance(meal_id, int) and not isinstance(meal_id, bool) for meal_id in meal_ids)
+                or meal_ids[0] == meal_ids[1]):
+            return make_response(jsonify({'error': 'meal_ids must be a list of two different meal IDs'}), 400)
+
+        app.logger.info("Queueing battle between meals %s and %s", meal_ids[0], meal_ids[1])
+        job_id = battle_queue.submit(meal_ids[0], meal_ids[1])
+
+        return make_response(jsonify({'status': 'battle queued', 'job_id': job_id}), 202)
+    except BattleQueueFull as e:
+        app.logger.warning("Failed to queue battle: %s", str(e))
+        return make_response(jsonify({'error': str(e)}), 429)
+    except Exception as e:
+        app.logger.error(f"Error queueing battle: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
+@app.route('/api/battle-jobs/<string:job_id>', methods=['GET'])
+def get_battle_job(job_id: str) -> Response:
+    """
+    Route to get the status and result of a queued battle job.
+
+    Path Parameter:
+        - job_id (str): The ID of the battle job.
+
+    Returns:
+        JSON response with the job status (queued, running, awaiting_write, complete or failed)
+        and, once complete, the battle result.
+    Raises:
+        404 error if the job is unknown.
+    """
+    try:
+        app.logger.info(f"Retrieving battle job: {job_id}")
+
+        job = battle_queue.get_job(job_id)
+        return make_response(jsonify({'status': 'success', 'job': job}), 200)
+    except ValueError as e:
+        app.logger.error(f"Error retrieving battle job: {e}")
+        return make_response(jsonify({'error': str(e)}), 404)
+
+@app.route('/api/battle-jobs/metrics', methods=['GET'])
+def get_battle_queue_metrics() -> Response:
+    """
+    Route to get the depth and throughput counters of the battle job queue.
+
+    Returns:
+        JSON response with the battle queue metrics.
+    """
+    app.logger.info('Getting battle queue metrics')
+    return make_response(jsonify({'status': 'success', 'metrics': battle_queue.get_metrics()}), 200)
+
 @app.route('/api/clear-combatants', methods=['POST'])
 def clear_combatants() -> Response:
     """
@@ -225,6 +318,56 @@ def clear_combatants() -> Response:
         app.logger.error("Failed to clear combatants: %s", str(e))
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/find-opponent/<int:meal_id>', methods=['GET'])
+def find_opponent(meal_id: int) -> Response:
+    """
+    Route to find the live meals whose battle scores are closest to a meal's score.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal to match.
+
+    Query Parameters:
+        - k (int): The number of opponents to return. Default is 3.
+        - prep (str): If 'true', replace the current combatants with the meal and its closest opponent.
+
+    Returns:
+        JSON response with the closest-scored opponents and, if prepped, the combatants.
+    Raises:
+        400 error if k is not a positive integer.
+        500 error if there is an issue finding or preparing opponents.
+    """
+    try:
+        k = request.args.get('k', '3')
+        prep = request.args.get('prep', 'false').lower() == 'true'
+        app.logger.info("Finding %s opponents for meal ID %s", k, meal_id)
+
+        try:
+            k = int(k)
+            if k <= 0:
+                raise ValueError("k must be positive")
+        except ValueError:
+            return make_response(jsonify({'error': 'k must be a positive integer'}), 400)
+
+        opponents = kitchen_model.find_opponents(meal_id, k)
+        response = {'status': 'success', 'opponents': opponents}
+
+        if prep:
+            if not opponents:
+                return make_response(jsonify({'error': 'No opponents available to prep'}), 500)
+            app.logger.info("Prepping meal ID %s against meal ID %s", meal_id, opponents[0]['id'])
+            # Look both meals up first so a failed lookup leaves the current combatants in place
+            meal = kitchen_model.get_meal_by_id(meal_id)
+            opponent = kitchen_model.get_meal_by_id(opponents[0]['id'])
+            battle_model.clear_combatants()
+            battle_model.prep_combatant(meal)
+            battle_model.prep_combatant(opponent)
+            response['combatants'] = battle_model.get_combatants()
+
+        return make_response(jsonify(response), 200)
+    except Exception as e:
+        app.logger.error(f"Error finding opponents: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
+
 @app.route('/api/get-combatants', methods=['GET'])
 def get_combatants() -> Response:
     """
@@ -307,6 +450,32 @@ def get_leaderboard() -> Response:
         app.logger.error(f"Error generating leaderboard: {e}")
         return make_response(jsonify({'error': str(e)}), 500)
 
+@app.route('/api/meal-rank/<int:meal_id>', methods=['GET'])
+def get_meal_rank(meal_id: int) -> Response:
+    """
+    Route to get a single meal's leaderboard rank without fetching the whole leaderboard.
+
+    Path Parameter:
+        - meal_id (int): The ID of the meal.
+
+    Query Parameters:
+        - sort (str): The field to rank by ('wins' or 'win_pct'). Default is 'wins'.
+
+    Returns:
+        JSON response with the meal's rank, percentile and neighbors.
+    Raises:
+        500 error if the meal is not ranked or there is an issue retrieving the rank.
+    """
+    try:
+        sort_by = request.args.get('sort', 'wins')
+        app.logger.info("Retrieving rank for meal ID %s sorted by %s", meal_id, sort_by)
+
+        rank = kitchen_model.get_meal_rank(meal_id, sort_by)
+
+        return make_response(jsonify({'status': 'success', **rank}), 200)
+    except Exception as e:
+        app.logger.error(f"Error retrieving meal rank: {e}")
+        return make_response(jsonify({'error': str(e)}), 500)
 
 
 if __name__ == '__main__':
@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import List, Tuple
 
 from meal_max.models.kitchen_model import Meal, update_meal_stats
 from meal_max.utils.logger import configure_logger
@@ -16,6 +16,18 @@ class BattleModel:
         self.combatants: List[Meal] = []
 
     def battle(self) -> str:
+        winner, loser = self.fight()
+
+        # Update stats for both combatants
+        update_meal_stats(winner.id, 'win')
+        update_meal_stats(loser.id, 'loss')
+
+        # Remove the losing combatant from combatants
+        self.combatants.remove(loser)
+
+        return winner.meal
+
+    def fight(self) -> Tuple[Meal, Meal]:
         logger.info("Two meals enter, one meal leaves!")
 
         if len(self.combatants) < 2:
@@ -59,14 +71,7 @@ class BattleModel:
         # Log the winner
         logger.info("The winner is: %s", winner.meal)
 
-        # Update stats for both combatants
-        update_meal_stats(winner.id, 'win')
-        update_meal_stats(loser.id, 'loss')
-
-        # Remove the losing combatant from combatants
-        self.combatants.remove(loser)
-
-        return winner.meal
+        return winner, loser
 
     def clear_combatants(self):
         logger.info("Clearing the combatants list.")
@@ -79,7 +84,8 @@ class BattleModel:
         logger.info("Calculating battle score for %s: price=%.3f, cuisine=%s, difficulty=%s",
                     combatant.meal, combatant.price, combatant.cuisine, combatant.difficulty)
 
-        # Calculate score
+        # Calculate score (keep in sync with the battle_score column in sql/create_meal_table.sql,
+        # which both fresh databases and the migration in sql_utils are built from)
         score = (combatant.price * len(combatant.cuisine)) - difficulty_modifier[combatant.difficulty]
 
         # Log the calculated score
@@ -0,0 +1,209 @@
+from collections import OrderedDict
+import logging
+import os
+import queue
+import threading
+from typing import Any, List, Optional
+import uuid
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import get_meal_by_id, update_meal_stats_batch
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+class BattleQueueFull(Exception):
+    """Raised when a battle is submitted while the queue is at capacity."""
+
+
+class BattleQueue:
+    """
+    Bounded battle job queue served by a pool of worker threads.
+
+    Workers run each battle in its own BattleModel and hand the outcome to a
+    single writer thread, which records the stats of every finished battle
+    waiting at that moment in one transaction. Submitting raises
+    BattleQueueFull when the queue is at capacity so the caller can push back
+    on the client. The workers start on the first submission.
+
+    Settings not passed in are read from the BATTLE_WORKERS, BATTLE_QUEUE_SIZE,
+    BATTLE_BATCH_SIZE and BATTLE_JOB_HISTORY environment variables.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_size: Optional[int] = None,
+                 batch_size: Optional[int] = None, history: Optional[int] = None):
+        # load unset settings from the environment with default values
+        if workers is None:
+            workers = int(os.getenv("BATTLE_WORKERS", "4"))
+        if max_size is None:
+            max_size = int(os.getenv("BATTLE_QUEUE_SIZE", "100"))
+        if batch_size is None:
+            batch_size = int(os.getenv("BATTLE_BATCH_SIZE", "20"))
+        if history is None:
+            history = int(os.getenv("BATTLE_JOB_HISTORY", "1000"))
+
+        if workers < 1 or max_size < 1 or batch_size < 1:
+            raise ValueError("Workers, queue size and batch size must be positive.")
+
+        self.workers = workers
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.history = history
+
+        self._jobs: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._pending: queue.Queue = queue.Queue(maxsize=max_size)
+        self._finished: queue.Queue = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._threads_lock = threading.Lock()
+        self._running = 0
+        self._awaiting_write = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        with self._threads_lock:
+            if self._threads:
+                return
+
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"battle-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+            writer = threading.Thread(target=self._write, name="battle-writer", daemon=True)
+            writer.start()
+            self._threads.append(writer)
+
+        logger.info("Battle queue started with %d workers and capacity %d", self.workers, self.max_size)
+
+    def submit(self, meal_1_id: int, meal_2_id: int) -> str:
+        self.start()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            'id': job_id,
+            'status': 'queued',
+            'meal_ids': [meal_1_id, meal_2_id],
+            'result': None,
+            'error': None
+        }
+
+        with self._jobs_lock:
+            try:
+                self._pending.put_nowait(job_id)
+            except queue.Full:
+                logger.warning("Battle queue is full, rejecting battle between meals %s and %s",
+                               meal_1_id, meal_2_id)
+                raise BattleQueueFull("Battle queue is full, try again later")
+            self._jobs[job_id] = job
+            self._evict()
+
+        logger.info("Queued battle job %s between meals %s and %s", job_id, meal_1_id, meal_2_id)
+        return job_id
+
+    def get_job(self, job_id: str) -> dict[str, Any]:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                logger.info("Battle job %s not found", job_id)
+                raise ValueError(f"Battle job {job_id} not found")
+            return dict(job)
+
+    def get_metrics(self) -> dict[str, Any]:
+        with self._jobs_lock:
+            return {
+                'queue_depth': self._pending.qsize(),
+                'queue_capacity': self.max_size,
+                'workers': self.workers,
+                'running': self._running,
+                'awaiting_write': self._awaiting_write,
+                'completed': self._completed,
+                'failed': self._failed
+            }
+
+    def _work(self) -> None:
+        while True:
+            job_id = self._pending.get()
+            with self._jobs_lock:
+                job = self._jobs[job_id]
+                job['status'] = 'running'
+                self._running += 1
+
+            try:
+                model = BattleModel()
+                for meal_id in job['meal_ids']:
+                    model.prep_combatant(get_meal_by_id(meal_id))
+                winner, loser = model.fight()
+            except Exception as e:
+                logger.error("Battle job %s failed: %s", job_id, str(e))
+                with self._jobs_lock:
+                    self._running -= 1
+                self._fail([job_id], error=str(e))
+                continue
+
+            # Hand the job to the writer in the same step that stops counting it as running
+            with self._jobs_lock:
+                job['status'] = 'awaiting_write'
+                self._running -= 1
+                self._awaiting_write += 1
+            self._finished.put((job_id, winner, loser))
+
+    def _write(self) -> None:
+        while True:
+            batch = [self._finished.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._finished.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                errors = update_meal_stats_batch([(winner.id, loser.id) for _, winner, loser in batch])
+            except Exception as e:
+                logger.error("Failed to record stats for %d battle jobs: %s", len(batch), str(e))
+                with self._jobs_lock:
+                    self._awaiting_write -= len(batch)
+                self._fail([job_id for job_id, _, _ in batch], error=str(e))
+                continue
+
+            with self._jobs_lock:
+                self._awaiting_write -= len(batch)
+                for (job_id, winner, loser), error in zip(batch, errors):
+                    job = self._jobs[job_id]
+                    if error:
+                        job['status'] = 'failed'
+                        job['error'] = error
+                        self._failed += 1
+                        continue
+                    job['status'] = 'complete'
+                    job['result'] = {
+                        'winner': winner.meal,
+                        'winner_id': winner.id,
+                        'loser': loser.meal,
+                        'loser_id': loser.id
+                    }
+                    self._completed += 1
+
+    def _fail(self, job_ids: List[str], error: str) -> None:
+        with self._jobs_lock:
+            for job_id in job_ids:
+                job = self._jobs[job_id]
+                job['status'] = 'failed'
+                job['error'] = error
+                self._failed += 1
+
+    def _evict(self) -> None:
+        # Drop the oldest finished jobs once the history limit is exceeded
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]['status'] in ('complete', 'failed'):
+                del self._jobs[job_id]
+                excess -= 1
@@ -1,8 +1,9 @@
 from dataclasses import dataclass
 import logging
 import sqlite3
-from typing import Any
+from typing import Any, List, Optional, Tuple
 
+from meal_max.models.leaderboard_index import leaderboard_index
 from meal_max.utils.sql_utils import get_db_connection
 from meal_max.utils.logger import configure_logger
 
@@ -39,7 +40,9 @@ def create_meal(meal: str, cuisine: str, price: float, difficulty: str) -> None:
                 INSERT INTO meals (meal, cuisine, price, difficulty)
                 VALUES (?, ?, ?, ?)
             """, (meal, cuisine, price, difficulty))
-            conn.commit()
+            with leaderboard_index.updating():
+                conn.commit()
+                leaderboard_index.add_meal(cursor.lastrowid, meal)
 
             logger.info("Meal successfully added to the database: %s", meal)
 
@@ -67,7 +70,9 @@ def delete_meal(meal_id: int) -> None:
                 raise ValueError(f"Meal with ID {meal_id} not found")
 
             cursor.execute("UPDATE meals SET deleted = TRUE WHERE id = ?", (meal_id,))
-            conn.commit()
+            with leaderboard_index.updating():
+                conn.commit()
+                leaderboard_index.remove_meal(meal_id)
 
             logger.info("Meal with ID %s marked as deleted.", meal_id)
 
@@ -75,6 +80,62 @@ def delete_meal(meal_id: int) -> None:
         logger.error("Database error: %s", str(e))
         raise e
 
+def find_opponents(meal_id: int, k: int=3) -> List[dict[str, Any]]:
+    if not isinstance(k, int) or k <= 0:
+        raise ValueError(f"Invalid k: {k}. Must be a positive integer.")
+
+    columns = "id, meal, cuisine, price, difficulty, battle_score"
+
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT battle_score, deleted FROM meals WHERE id = ?", (meal_id,))
+            row = cursor.fetchone()
+
+            if not row:
+                logger.info("Meal with ID %s not found", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if row[1]:
+                logger.info("Meal with ID %s has been deleted", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has been deleted")
+            score = row[0]
+
+            # Walk the battle_score index outwards from the target in both directions
+            cursor.execute(f"""
+                SELECT {columns} FROM meals
+                WHERE deleted = FALSE AND battle_score >= ? AND id != ?
+                ORDER BY battle_score ASC LIMIT ?
+            """, (score, meal_id, k))
+            rows = cursor.fetchall()
+            cursor.execute(f"""
+                SELECT {columns} FROM meals
+                WHERE deleted = FALSE AND battle_score < ?
+                ORDER BY battle_score DESC LIMIT ?
+            """, (score, k))
+            rows += cursor.fetchall()
+
+        rows.sort(key=lambda row: (abs(row[5] - score), row[0]))
+
+        opponents = []
+        for row in rows[:k]:
+            opponent = {
+                'id': row[0],
+                'meal': row[1],
+                'cuisine': row[2],
+                'price': row[3],
+                'difficulty': row[4],
+                'battle_score': row[5],
+                'score_delta': round(abs(row[5] - score), 3)
+            }
+            opponents.append(opponent)
+
+        logger.info("Found %d opponents for meal with ID %s", len(opponents), meal_id)
+        return opponents
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
 def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
     query = """
         SELECT id, meal, cuisine, price, difficulty, battles, wins, (wins * 1.0 / battles) AS win_pct
@@ -116,6 +177,11 @@ def get_leaderboard(sort_by: str="wins") -> dict[str, Any]:
         logger.error("Database error: %s", str(e))
         raise e
 
+def get_meal_rank(meal_id: int, sort_by: str="wins") -> dict[str, Any]:
+    rank = leaderboard_index.get_rank(meal_id, sort_by)
+    logger.info("Rank retrieved for meal with ID %s: %d of %d", meal_id, rank['rank'], rank['total'])
+    return rank
+
 def get_meal_by_id(meal_id: int) -> Meal:
     try:
         with get_db_connection() as conn:
@@ -179,7 +245,60 @@ def update_meal_stats(meal_id: int, result: str) -> None:
             else:
                 raise ValueError(f"Invalid result: {result}. Expected 'win' or 'loss'.")
 
-            conn.commit()
+            with leaderboard_index.updating():
+                conn.commit()
+                leaderboard_index.record_result(meal_id, result)
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise e
+
+
+def update_meal_stats_batch(battles: List[Tuple[int, int]]) -> List[Optional[str]]:
+    """
+    Record (winner_id, loser_id) battle outcomes in one transaction.
+
+    A battle is recorded for both meals or for neither: if either meal is
+    missing or deleted, both rows are skipped and that battle's entry in the
+    returned list holds the error. Recorded battles have None.
+    """
+    errors: List[Optional[str]] = []
+    try:
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+            # Take the write lock first so no meal is deleted between the checks and the updates
+            cursor.execute("BEGIN IMMEDIATE")
+            recorded = []
+            for winner_id, loser_id in battles:
+                error = None
+                for meal_id in (winner_id, loser_id):
+                    cursor.execute("SELECT deleted FROM meals WHERE id = ?", (meal_id,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        error = f"Meal with ID {meal_id} not found"
+                        break
+                    if row[0]:
+                        error = f"Meal with ID {meal_id} has been deleted"
+                        break
+
+                if error:
+                    logger.warning("Skipping battle between meals %s and %s: %s", winner_id, loser_id, error)
+                    errors.append(error)
+                    continue
+
+                cursor.execute("UPDATE meals SET battles = battles + 1, wins = wins + 1 WHERE id = ?", (winner_id,))
+                cursor.execute("UPDATE meals SET battles = battles + 1 WHERE id = ?", (loser_id,))
+                recorded.append((winner_id, loser_id))
+                errors.append(None)
+
+            with leaderboard_index.updating():
+                conn.commit()
+                for winner_id, loser_id in recorded:
+                    leaderboard_index.record_result(winner_id, 'win')
+                    leaderboard_index.record_result(loser_id, 'loss')
+
+            logger.info("Recorded %d battles in one batch", len(recorded))
+            return errors
 
     except sqlite3.Error as e:
         logger.error("Database error: %s", str(e))
@@ -0,0 +1,178 @@
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+
+from meal_max.utils.sql_utils import get_db_connection
+from meal_max.utils.logger import configure_logger
+
+
+logger = logging.getLogger(__name__)
+configure_logger(logger)
+
+
+SORT_FIELDS = ('wins', 'win_pct')
+
+
+class LeaderboardIndex:
+    """
+    In-process order-statistic index over the leaderboard.
+
+    Keeps one sorted list of (-value, meal_id) keys per sort field so a meal's
+    rank and its neighbors can be found with a binary search instead of
+    fetching and scanning the whole leaderboard. Like get_leaderboard, only
+    meals that are not deleted and have fought at least one battle are ranked.
+
+    Rank lookups are O(log n). Updates are O(n) in the worst case, because
+    inserting into or deleting from a Python list shifts the entries after
+    it, but that shift is a single memmove and is cheap at this table's size.
+
+    Until the index has been loaded from the database, updates are ignored
+    (the database already holds them) and the first rank lookup loads it.
+    Writers commit and apply the matching update inside updating(), so a
+    load never sees a commit whose update is still to be applied.
+    """
+
+    def __init__(self):
+        # Reentrant so the update methods can be called inside updating()
+        self._lock = threading.RLock()
+        self._meals: Dict[int, Dict[str, Any]] = {}
+        self._keys: Dict[str, List[Tuple[float, int]]] = {field: [] for field in SORT_FIELDS}
+        self._loaded = False
+
+    def rebuild(self) -> None:
+        """
+        Reload the index from the meals table.
+        """
+        with self._lock:
+            self._load()
+
+    @contextmanager
+    def updating(self) -> Iterator[None]:
+        """
+        Hold the index lock across a database commit and the matching index update.
+        """
+        with self._lock:
+            yield
+
+    def add_meal(self, meal_id: int, meal: str) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            self._meals[meal_id] = {'meal': meal, 'battles': 0, 'wins': 0}
+
+    def remove_meal(self, meal_id: int) -> None:
+        with self._lock:
+            if not self._loaded or meal_id not in self._meals:
+                return
+            self._unlink(meal_id)
+            del self._meals[meal_id]
+
+    def record_result(self, meal_id: int, result: str) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            if meal_id not in self._meals:
+                logger.warning("Meal with ID %s is missing from the leaderboard index", meal_id)
+                return
+            self._unlink(meal_id)
+            stats = self._meals[meal_id]
+            stats['battles'] += 1
+            if result == 'win':
+                stats['wins'] += 1
+            for field in SORT_FIELDS:
+                insort(self._keys[field], self._key(field, meal_id))
+
+    def get_rank(self, meal_id: int, sort_by: str = "wins") -> dict[str, Any]:
+        """
+        Return the rank, percentile and immediate neighbors of a meal.
+
+        Ties share the same rank, matching competition ranking.
+
+        Raises:
+            ValueError: If sort_by is invalid, or the meal is unknown or unranked.
+        """
+        if sort_by not in SORT_FIELDS:
+            logger.error("Invalid sort_by parameter: %s", sort_by)
+            raise ValueError("Invalid sort_by parameter: %s" % sort_by)
+
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if meal_id not in self._meals:
+                logger.info("Meal with ID %s not found", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} not found")
+            if self._meals[meal_id]['battles'] == 0:
+                logger.info("Meal with ID %s has not battled yet", meal_id)
+                raise ValueError(f"Meal with ID {meal_id} has not battled yet")
+
+            keys = self._keys[sort_by]
+            key = self._key(sort_by, meal_id)
+            position = bisect_left(keys, key)
+            rank = bisect_left(keys, (key[0],)) + 1
+            total = len(keys)
+
+            above = self._entry(keys[position - 1][1]) if position > 0 else None
+            below = self._entry(keys[position + 1][1]) if position + 1 < total else None
+
+            return {
+                'meal': self._entry(meal_id),
+                'sort_by': sort_by,
+                'rank': rank,
+                'total': total,
+                'percentile': round((total - rank + 1) * 100.0 / total, 1),
+                'neighbors': {'above': above, 'below': below}
+            }
+
+    def _load(self) -> None:
+        # Callers hold the lock, and writers commit under it too, so every commit
+        # is either in this snapshot with its update already applied, or comes after
+        try:
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT id, meal, battles, wins FROM meals WHERE deleted = false")
+                rows = cursor.fetchall()
+        except sqlite3.Error as e:
+            logger.error("Database error: %s", str(e))
+            raise e
+
+        self._meals = {}
+        self._keys = {field: [] for field in SORT_FIELDS}
+        for meal_id, meal, battles, wins in rows:
+            self._meals[meal_id] = {'meal': meal, 'battles': battles, 'wins': wins}
+            if battles > 0:
+                for field in SORT_FIELDS:
+                    self._keys[field].append(self._key(field, meal_id))
+        for keys in self._keys.values():
+            keys.sort()
+        self._loaded = True
+
+        logger.info("Leaderboard index rebuilt with %d meals", len(rows))
+
+    def _key(self, field: str, meal_id: int) -> Tuple[float, int]:
+        stats = self._meals[meal_id]
+        if field == 'wins':
+            return (-stats['wins'], meal_id)
+        return (-(stats['wins'] * 1.0 / stats['battles']), meal_id)
+
+    def _unlink(self, meal_id: int) -> None:
+        if self._meals[meal_id]['battles'] == 0:
+            return
+        for field in SORT_FIELDS:
+            keys = self._keys[field]
+            del keys[bisect_left(keys, self._key(field, meal_id))]
+
+    def _entry(self, meal_id: int) -> dict[str, Any]:
+        stats = self._meals[meal_id]
+        return {
+            'id': meal_id,
+            'meal': stats['meal'],
+            'battles': stats['battles'],
+            'wins': stats['wins'],
+            'win_pct': round(stats['wins'] * 100.0 / stats['battles'], 1)
+        }
+
+
+leaderboard_index = LeaderboardIndex()
@@ -1,7 +1,9 @@
 from contextlib import contextmanager
 import logging
 import os
+import re
 import sqlite3
+from typing import List, Tuple
 
 from meal_max.utils.logger import configure_logger
 
@@ -37,6 +39,90 @@ def check_table_exists(tablename: str):
         logger.error(error_message)
         raise Exception(error_message) from e
 
+def check_column_exists(tablename: str, column: str):
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        # table_xinfo also lists generated columns, which table_info hides
+        cursor.execute(f"PRAGMA table_xinfo({tablename});")
+        columns = [row[1] for row in cursor.fetchall()]
+        conn.close()
+    except sqlite3.Error as e:
+        error_message = f"Column check error: {e}"
+        logger.error(error_message)
+        raise Exception(error_message) from e
+    if column not in columns:
+        error_message = f"Column check error: {tablename}.{column} is missing, restart the app to migrate the database"
+        logger.error(error_message)
+        raise Exception(error_message)
+
+# The meals schema script; migrations build their DDL from it
+MEALS_SCHEMA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "sql", "create_meal_table.sql"
+)
+
+def read_meals_schema(tablename: str = "meals") -> Tuple[str, List[str]]:
+    """
+    Return the CREATE TABLE statement from create_meal_table.sql, renamed to tablename,
+    and the script's CREATE INDEX statements.
+    """
+    with open(MEALS_SCHEMA_PATH) as f:
+        # Drop -- comments first so a semicolon inside one cannot split a statement
+        script = re.sub(r"--[^\n]*", "", f.read())
+    statements = [statement.strip() for statement in script.split(";") if statement.strip()]
+
+    create_tables = [statement for statement in statements if statement.startswith("CREATE TABLE meals ")]
+    if not create_tables:
+        raise ValueError(f"No CREATE TABLE meals statement in {MEALS_SCHEMA_PATH}")
+    create_table = create_tables[0]
+    create_indexes = [statement for statement in statements if statement.startswith("CREATE INDEX")]
+    return create_table.replace("CREATE TABLE meals ", f"CREATE TABLE {tablename} ", 1), create_indexes
+
+def migrate_meals_table():
+    """
+    Rebuild a meals table created before the battle_score column existed.
+
+    SQLite cannot add a STORED generated column with ALTER TABLE, so the rows
+    are copied into a new table that replaces the old one in one transaction.
+    Databases without a meals table, or that already have the column, are left alone.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'meals'")
+        if not cursor.fetchone():
+            logger.info("No meals table to migrate.")
+            return
+
+        cursor.execute("PRAGMA table_xinfo(meals)")
+        if 'battle_score' in [row[1] for row in cursor.fetchall()]:
+            return
+
+        logger.info("Migrating meals table to add the battle_score column.")
+        create_table, create_indexes = read_meals_schema("meals_new")
+        cursor.execute("BEGIN")
+        cursor.execute(create_table)
+        cursor.execute("""
+            INSERT INTO meals_new (id, meal, cuisine, price, difficulty, battles, wins, deleted)
+            SELECT id, meal, cuisine, price, difficulty, battles, wins, deleted FROM meals
+        """)
+        cursor.execute("DROP TABLE meals")
+        cursor.execute("ALTER TABLE meals_new RENAME TO meals")
+        for create_index in create_indexes:
+            cursor.execute(create_index)
+        conn.commit()
+        logger.info("meals table migrated.")
+    except (sqlite3.Error, OSError, ValueError) as e:
+        if conn:
+            conn.rollback()
+        error_message = f"Migration error: {e}"
+        logger.error(error_message)
+        raise Exception(error_message) from e
+    finally:
+        if conn:
+            conn.close()
+
 ###################################################
 #
 # This one yields rather than returns.
@@ -7,5 +7,10 @@ CREATE TABLE meals (
     difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
     battles INTEGER DEFAULT 0,
     wins INTEGER DEFAULT 0,
-    deleted BOOLEAN DEFAULT FALSE
-);
\ No newline at end of file
+    deleted BOOLEAN DEFAULT FALSE,
+    -- Mirrors BattleModel.get_battle_score. sql_utils.migrate_meals_table also reads this file.
+    battle_score REAL GENERATED ALWAYS AS (
+        price * length(cuisine) - CASE difficulty WHEN 'HIGH' THEN 1 WHEN 'MED' THEN 2 WHEN 'LOW' THEN 3 END
+    ) STORED
+);
+CREATE INDEX idx_meals_battle_score ON meals (battle_score) WHERE deleted = FALSE;
\ No newline at end of file
@@ -0,0 +1,37 @@
+import os
+import sqlite3
+
+import pytest
+
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql")
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Create a fresh meals database from create_meal_table.sql and point DB_PATH at it."""
+    path = str(tmp_path / "meal_max.db")
+    with open(os.path.join(SQL_DIR, "create_meal_table.sql")) as f:
+        schema = f.read()
+
+    conn = sqlite3.connect(path)
+    conn.executescript(schema)
+    conn.close()
+
+    monkeypatch.setattr("meal_max.utils.sql_utils.DB_PATH", path)
+    return path
+
+
+@pytest.fixture
+def insert_meal(db_path):
+    """Insert a meal row directly, bypassing kitchen_model, and return its ID."""
+    def _insert(meal, cuisine="Italian", price=10.0, difficulty="MED", battles=0, wins=0, deleted=False):
+        conn = sqlite3.connect(db_path)
+        cursor = conn.execute(
+            "INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins, deleted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (meal, cuisine, price, difficulty, battles, wins, deleted)
+        )
+        conn.commit()
+        conn.close()
+        return cursor.lastrowid
+    return _insert
@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from meal_max.models import battle_queue as battle_queue_module
+from meal_max.models.battle_queue import BattleQueue, BattleQueueFull
+from meal_max.models.kitchen_model import delete_meal
+
+
+def wait_for(predicate, timeout=5.0):
+    """Poll until predicate() is true or fail the test after timeout seconds."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    pytest.fail("Timed out waiting for battle queue")
+
+
+@pytest.fixture
+def meals(db_path, insert_meal):
+    """Three meals with distinct battle scores."""
+    return [
+        insert_meal("Pizza", cuisine="Italian", price=10.0),
+        insert_meal("Sushi", cuisine="Japanese", price=20.0),
+        insert_meal("Tacos", cuisine="Mexican", price=5.0)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def mock_random(mocker):
+    """With a random number of 0 the first combatant always wins."""
+    return mocker.patch("meal_max.models.battle_model.get_random", return_value=0.0)
+
+
+@pytest.fixture
+def blocked_writer(mocker):
+    """Hold the writer thread on its first batch until the returned event is set."""
+    release = threading.Event()
+    calls = []
+    update = battle_queue_module.update_meal_stats_batch
+
+    def _update(battles):
+        calls.append(battles)
+        release.wait(5)
+        return update(battles)
+
+    mocker.patch("meal_max.models.battle_queue.update_meal_stats_batch", side_effect=_update)
+    yield release, calls
+    release.set()
+
+
+def test_workers_start_on_first_submit(meals):
+    """Constructing the queue does not start any threads."""
+    queue = BattleQueue(workers=2)
+    assert queue._threads == []
+
+    job_id = queue.submit(meals[0], meals[1])
+    assert len(queue._threads) == 3
+    wait_for(lambda: queue.get_job(job_id)["status"] == "complete")
+
+
+def test_settings_read_from_environment(monkeypatch):
+    """Unset settings are read from the environment when the queue is created."""
+    monkeypatch.setenv("BATTLE_WORKERS", "7")
+    monkeypatch.setenv("BATTLE_QUEUE_SIZE", "9")
+    queue = BattleQueue(batch_size=3)
+    assert queue.workers == 7
+    assert queue.max_size == 9
+    assert queue.batch_size == 3
+
+
+def test_invalid_settings():
+    """Non-positive settings are rejected."""
+    with pytest.raises(ValueError, match="must be positive"):
+        BattleQueue(workers=0)
+
+
+def test_battle_job_completes_and_records_stats(db_path, meals):
+    """A submitted battle completes with a result and its stats are written."""
+    queue = BattleQueue(workers=1)
+    job_id = queue.submit(meals[1], meals[0])
+
+    wait_for(lambda: queue.get_job(job_id)["status"] == "complete")
+    job = queue.get_job(job_id)
+    assert job["result"] == {"winner": "Sushi", "winner_id": meals[1], "loser": "Pizza", "loser_id": meals[0]}
+    assert job["error"] is None
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, battles, wins FROM meals ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(meals[0], 1, 0), (meals[1], 1, 1), (meals[2], 0, 0)]
+
+    metrics = queue.get_metrics()
+    assert metrics["completed"] == 1
+    assert metrics["failed"] == 0
+    assert metrics["queue_depth"] == 0
+
+
+def test_battle_job_fails_for_missing_meal(meals):
+    """A battle against an unknown meal is marked failed with the error."""
+    queue = BattleQueue(workers=1)
+    job_id = queue.submit(meals[0], 99)
+
+    wait_for(lambda: queue.get_job(job_id)["status"] == "failed")
+    assert queue.get_job(job_id)["error"] == "Meal with ID 99 not found"
+    assert queue.get_metrics()["failed"] == 1
+
+
+def test_unknown_job():
+    """Looking up an unknown job raises a ValueError."""
+    with pytest.raises(ValueError, match="not found"):
+        BattleQueue().get_job("missing")
+
+
+def test_awaiting_write_status_matches_metrics(meals, blocked_writer):
+    """A fought battle waiting on the writer is reported as awaiting_write by both APIs."""
+    release, _ = blocked_writer
+    queue = BattleQueue(workers=1)
+    job_id = queue.submit(meals[0], meals[1])
+
+    wait_for(lambda: queue.get_job(job_id)["status"] == "awaiting_write")
+    metrics = queue.get_metrics()
+    assert metrics["running"] == 0
+    assert metrics["awaiting_write"] == 1
+
+    release.set()
+    wait_for(lambda: queue.get_job(job_id)["status"] == "complete")
+    assert queue.get_metrics()["awaiting_write"] == 0
+
+
+def test_writer_batches_finished_jobs(meals, blocked_writer):
+    """Jobs that finish while the writer is busy are written together in one batch."""
+    release, calls = blocked_writer
+    queue = BattleQueue(workers=2)
+    first = queue.submit(meals[0], meals[1])
+    wait_for(lambda: len(calls) == 1)
+
+    job_ids = [queue.submit(meals[0], meals[2]), queue.submit(meals[1], meals[2]), queue.submit(meals[2], meals[0])]
+    wait_for(lambda: queue.get_metrics()["awaiting_write"] == 4)
+
+    release.set()
+    wait_for(lambda: all(queue.get_job(job_id)["status"] == "complete" for job_id in [first] + job_ids))
+    assert len(calls) == 2
+    assert len(calls[1]) == 3
+
+
+def test_meal_deleted_before_write_fails_job(db_path, meals, blocked_writer):
+    """A battle whose meal is deleted before the write is failed and neither meal's stats change."""
+    release, calls = blocked_writer
+    queue = BattleQueue(workers=1)
+    first = queue.submit(meals[0], meals[1])
+    wait_for(lambda: len(calls) == 1)
+
+    second = queue.submit(meals[1], meals[2])
+    wait_for(lambda: queue.get_job(second)["status"] == "awaiting_write")
+    delete_meal(meals[2])
+
+    release.set()
+    wait_for(lambda: queue.get_job(second)["status"] == "failed")
+    job = queue.get_job(second)
+    assert job["error"] == f"Meal with ID {meals[2]} has been deleted"
+    assert job["result"] is None
+    assert queue.get_job(first)["status"] == "complete"
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, battles, wins FROM meals ORDER BY id").fetchall()
+    conn.close()
+    assert rows == [(meals[0], 1, 1), (meals[1], 1, 0), (meals[2], 0, 0)]
+
+    metrics = queue.get_metrics()
+    assert metrics["completed"] == 1
+    assert metrics["failed"] == 1
+    assert metrics["awaiting_write"] == 0
+
+
+def test_full_queue_raises(meals, mock_random):
+    """Submitting to a full queue raises BattleQueueFull."""
+    release = threading.Event()
+    mock_random.side_effect = lambda: release.wait(5) and 0.0
+    queue = BattleQueue(workers=1, max_size=1)
+    try:
+        queue.submit(meals[0], meals[1])
+        wait_for(lambda: queue.get_metrics()["running"] == 1)
+        queue.submit(meals[0], meals[2])
+
+        with pytest.raises(BattleQueueFull):
+            queue.submit(meals[1], meals[2])
+        assert queue.get_metrics()["queue_depth"] == 1
+    finally:
+        release.set()
+    wait_for(lambda: queue.get_metrics()["completed"] == 2)
+
+
+def test_finished_jobs_evicted_beyond_history(meals):
+    """Once the history limit is exceeded, the oldest finished jobs are dropped."""
+    queue = BattleQueue(workers=1, history=2)
+    first = queue.submit(meals[0], meals[1])
+    second = queue.submit(meals[0], meals[2])
+    wait_for(lambda: all(queue.get_job(job_id)["status"] == "complete" for job_id in (first, second)))
+
+    third = queue.submit(meals[1], meals[2])
+    with pytest.raises(ValueError, match="not found"):
+        queue.get_job(first)
+    assert queue.get_job(second)["status"] == "complete"
+    wait_for(lambda: queue.get_job(third)["status"] == "complete")
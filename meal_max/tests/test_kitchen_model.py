@@ -0,0 +1,76 @@
+import sqlite3
+
+import pytest
+
+from meal_max.models.battle_model import BattleModel
+from meal_max.models.kitchen_model import find_opponents, get_meal_by_id
+
+
+@pytest.fixture
+def meals(db_path, insert_meal):
+    """Meals whose battle scores (price * len(cuisine) - difficulty modifier) are 37, 39, 41, 45, 47, 59 and 78."""
+    return {
+        "Pizza": insert_meal("Pizza", cuisine="Ital", price=10.0, difficulty="LOW"),
+        "Pasta": insert_meal("Pasta", cuisine="Ital", price=10.0, difficulty="HIGH", deleted=True),
+        "Sushi": insert_meal("Sushi", cuisine="Ital", price=11.0, difficulty="LOW"),
+        "Tacos": insert_meal("Tacos", cuisine="Ital", price=11.75, difficulty="MED"),
+        "Curry": insert_meal("Curry", cuisine="Ital", price=12.5, difficulty="LOW"),
+        "Ramen": insert_meal("Ramen", cuisine="Ital", price=15.5, difficulty="LOW"),
+        "Steak": insert_meal("Steak", cuisine="American", price=10.0, difficulty="MED")
+    }
+
+
+def test_battle_score_column_matches_battle_model(db_path, meals):
+    """The stored battle_score of every live meal agrees with BattleModel.get_battle_score."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT id, battle_score FROM meals WHERE deleted = FALSE").fetchall()
+    conn.close()
+
+    model = BattleModel()
+    assert len(rows) == 6
+    for meal_id, battle_score in rows:
+        assert battle_score == pytest.approx(model.get_battle_score(get_meal_by_id(meal_id)))
+
+
+def test_find_opponents_merges_both_directions(meals):
+    """Opponents above and below the target's score are merged by distance."""
+    opponents = find_opponents(meals["Tacos"], k=3)
+    assert [opponent["meal"] for opponent in opponents] == ["Curry", "Sushi", "Pizza"]
+    assert [opponent["score_delta"] for opponent in opponents] == [2.0, 4.0, 8.0]
+
+
+def test_find_opponents_ties_break_by_id(meals):
+    """Opponents at the same distance are ordered by meal ID."""
+    opponents = find_opponents(meals["Sushi"], k=2)
+    assert [opponent["meal"] for opponent in opponents] == ["Pizza", "Tacos"]
+
+
+def test_find_opponents_at_ends_of_range(meals):
+    """The lowest and highest scored meals only draw opponents from one side."""
+    assert [opponent["meal"] for opponent in find_opponents(meals["Pizza"], k=2)] == ["Sushi", "Tacos"]
+    assert [opponent["meal"] for opponent in find_opponents(meals["Steak"], k=2)] == ["Ramen", "Curry"]
+
+
+def test_find_opponents_skips_deleted_and_self(meals):
+    """Deleted meals and the target itself are never returned."""
+    opponents = find_opponents(meals["Sushi"], k=10)
+    names = [opponent["meal"] for opponent in opponents]
+    assert "Pasta" not in names
+    assert "Sushi" not in names
+    assert len(opponents) == 5
+
+
+def test_find_opponents_includes_equal_scores(meals, insert_meal):
+    """A meal with exactly the target's score is the closest opponent."""
+    twin = insert_meal("Pizza Bianca", cuisine="Ital", price=10.0, difficulty="LOW")
+    assert find_opponents(meals["Pizza"], k=1)[0]["id"] == twin
+
+
+def test_find_opponents_errors(meals):
+    """Unknown or deleted meals and invalid k raise a ValueError."""
+    with pytest.raises(ValueError, match="not found"):
+        find_opponents(99)
+    with pytest.raises(ValueError, match="has been deleted"):
+        find_opponents(meals["Pasta"])
+    with pytest.raises(ValueError, match="Invalid k"):
+        find_opponents(meals["Pizza"], k=0)
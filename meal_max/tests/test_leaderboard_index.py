@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from meal_max.models import kitchen_model
+
+from meal_max.models.leaderboard_index import LeaderboardIndex
+
+
+@pytest.fixture
+def index(db_path, insert_meal):
+    """A loaded index over four ranked meals and one meal that has not battled."""
+    insert_meal("Pizza", battles=4, wins=3)
+    insert_meal("Sushi", battles=5, wins=3)
+    insert_meal("Tacos", battles=2, wins=1)
+    insert_meal("Curry", battles=1, wins=0)
+    insert_meal("Salad")
+    index = LeaderboardIndex()
+    index.rebuild()
+    return index
+
+
+def test_rank_by_wins_ties_share_rank(index):
+    """Meals with equal wins share a rank and the next meal skips ahead."""
+    assert index.get_rank(1)["rank"] == 1
+    assert index.get_rank(2)["rank"] == 1
+    rank = index.get_rank(3)
+    assert rank["rank"] == 3
+    assert rank["total"] == 4
+    assert rank["percentile"] == 50.0
+
+
+def test_rank_neighbors(index):
+    """Neighbors are the meals directly above and below in sort order."""
+    rank = index.get_rank(3)
+    assert rank["neighbors"]["above"]["meal"] == "Sushi"
+    assert rank["neighbors"]["below"]["meal"] == "Curry"
+
+    top = index.get_rank(1)
+    assert top["neighbors"]["above"] is None
+
+    bottom = index.get_rank(4)
+    assert bottom["neighbors"]["below"] is None
+    assert bottom["percentile"] == 25.0
+
+
+def test_rank_by_win_pct(index):
+    """Ranking by win_pct orders by wins / battles."""
+    assert index.get_rank(1, "win_pct")["rank"] == 1
+    assert index.get_rank(2, "win_pct")["rank"] == 2
+    assert index.get_rank(3, "win_pct")["rank"] == 3
+    assert index.get_rank(1, "win_pct")["meal"]["win_pct"] == 75.0
+
+
+def test_record_result_updates_rank(index):
+    """A recorded win moves the meal past others with fewer wins."""
+    index.record_result(3, "win")
+    index.record_result(3, "win")
+    index.record_result(3, "win")
+    rank = index.get_rank(3)
+    assert rank["rank"] == 1
+    assert rank["meal"]["battles"] == 5
+    assert rank["meal"]["wins"] == 4
+    assert index.get_rank(1)["rank"] == 2
+
+
+def test_first_result_makes_meal_ranked(index):
+    """A meal enters the ranking after its first battle."""
+    with pytest.raises(ValueError, match="has not battled yet"):
+        index.get_rank(5)
+
+    index.record_result(5, "loss")
+    rank = index.get_rank(5)
+    assert rank["rank"] == 4
+    assert rank["total"] == 5
+
+
+def test_add_and_remove_meal(index):
+    """Added meals start unranked and removed meals drop out of the ranking."""
+    index.add_meal(6, "Ramen")
+    with pytest.raises(ValueError, match="has not battled yet"):
+        index.get_rank(6)
+
+    index.remove_meal(1)
+    with pytest.raises(ValueError, match="not found"):
+        index.get_rank(1)
+    assert index.get_rank(2)["total"] == 3
+
+
+def test_invalid_sort_by(index):
+    """An unknown sort field raises a ValueError."""
+    with pytest.raises(ValueError, match="Invalid sort_by parameter"):
+        index.get_rank(1, "battles")
+
+
+def test_lazy_load_on_first_lookup(db_path, insert_meal):
+    """Updates before the index is loaded are skipped and the first lookup loads from the database."""
+    insert_meal("Pizza", battles=2, wins=2)
+    insert_meal("Sushi", battles=2, wins=1)
+    index = LeaderboardIndex()
+
+    index.record_result(2, "win")
+    index.remove_meal(1)
+
+    rank = index.get_rank(1)
+    assert rank["rank"] == 1
+    assert index.get_rank(2)["meal"]["wins"] == 1
+
+
+def test_load_during_update_does_not_count_result_twice(db_path, insert_meal, monkeypatch, mocker):
+    """A rank lookup that loads the index while a result is being recorded sees it exactly once."""
+    insert_meal("Pizza", battles=1, wins=1)
+    index = LeaderboardIndex()
+    monkeypatch.setattr(kitchen_model, "leaderboard_index", index)
+
+    record_result = index.record_result
+    lookups = []
+    threads = []
+
+    def _record_result(meal_id, result):
+        # The result is committed; a concurrent lookup now tries to load the index
+        lookup = threading.Thread(target=lambda: lookups.append(index.get_rank(meal_id)))
+        lookup.start()
+        lookup.join(0.2)
+        record_result(meal_id, result)
+        threads.append(lookup)
+
+    mocker.patch.object(index, "record_result", side_effect=_record_result)
+    kitchen_model.update_meal_stats(1, "win")
+    threads[0].join(5)
+
+    meal = index.get_rank(1)["meal"]
+    assert meal["battles"] == 2
+    assert meal["wins"] == 2
+    assert lookups[0]["meal"]["battles"] == 2
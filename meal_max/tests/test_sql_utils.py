@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from meal_max.utils.sql_utils import check_column_exists, migrate_meals_table, read_meals_schema
+
+
+OLD_MEALS_TABLE = """
+    CREATE TABLE meals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meal TEXT NOT NULL UNIQUE,
+        cuisine TEXT NOT NULL,
+        price REAL NOT NULL,
+        difficulty TEXT CHECK(difficulty IN ('HIGH', 'MED', 'LOW')),
+        battles INTEGER DEFAULT 0,
+        wins INTEGER DEFAULT 0,
+        deleted BOOLEAN DEFAULT FALSE
+    )
+"""
+
+
+@pytest.fixture
+def old_db_path(tmp_path, monkeypatch):
+    """A database created before the battle_score column existed."""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute(OLD_MEALS_TABLE)
+    conn.execute("INSERT INTO meals (meal, cuisine, price, difficulty, battles, wins) VALUES ('Spaghetti', 'Italian', 12.5, 'MED', 6, 3)")
+    conn.execute("INSERT INTO meals (meal, cuisine, price, difficulty, deleted) VALUES ('Tacos', 'Mexican', 8.0, 'LOW', TRUE)")
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr("meal_max.utils.sql_utils.DB_PATH", path)
+    return path
+
+
+def test_check_column_exists_missing(old_db_path):
+    """A missing column fails the check with a clear error."""
+    with pytest.raises(Exception, match="meals.battle_score is missing"):
+        check_column_exists("meals", "battle_score")
+
+
+def test_migrate_adds_battle_score(old_db_path):
+    """Migration keeps every row and computes battle_score for each."""
+    migrate_meals_table()
+    check_column_exists("meals", "battle_score")
+
+    conn = sqlite3.connect(old_db_path)
+    rows = conn.execute("SELECT id, meal, battles, wins, deleted, battle_score FROM meals ORDER BY id").fetchall()
+    indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+    conn.execute("INSERT INTO meals (meal, cuisine, price, difficulty) VALUES ('Curry', 'Indian', 9.0, 'HIGH')")
+    new_id = conn.execute("SELECT id FROM meals WHERE meal = 'Curry'").fetchone()[0]
+    conn.close()
+
+    assert rows == [(1, "Spaghetti", 6, 3, 0, 85.5), (2, "Tacos", 0, 0, 1, 53.0)]
+    assert "idx_meals_battle_score" in indexes
+    assert new_id == 3
+
+
+def test_migrate_is_idempotent(db_path):
+    """Databases that already have the column are left unchanged."""
+    migrate_meals_table()
+    migrate_meals_table()
+    check_column_exists("meals", "battle_score")
+
+
+def test_migrate_without_meals_table(tmp_path, monkeypatch):
+    """A database without a meals table is left alone."""
+    path = str(tmp_path / "empty.db")
+    monkeypatch.setattr("meal_max.utils.sql_utils.DB_PATH", path)
+    migrate_meals_table()
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT name FROM sqlite_master").fetchall() == []
+    conn.close()
+
+
+def test_read_meals_schema():
+    """The migration DDL comes from create_meal_table.sql, renamed to the requested table."""
+    create_table, create_indexes = read_meals_schema("meals_new")
+    assert create_table.startswith("CREATE TABLE meals_new (")
+    assert "battle_score REAL GENERATED ALWAYS AS" in create_table
+    assert create_indexes == ["CREATE INDEX idx_meals_battle_score ON meals (battle_score) WHERE deleted = FALSE"]
+
+
+def test_migrate_missing_schema_file(old_db_path, monkeypatch, tmp_path):
+    """A missing schema script fails the migration and leaves the old table in place."""
+    monkeypatch.setattr("meal_max.utils.sql_utils.MEALS_SCHEMA_PATH", str(tmp_path / "missing.sql"))
+    with pytest.raises(Exception, match="Migration error"):
+        migrate_meals_table()
+    with pytest.raises(Exception, match="meals.battle_score is missing"):
+        check_column_exists("meals", "battle_score")